@@ -5,6 +5,7 @@
 """
 
 import json
+import random
 import re
 import time
 import logging
@@ -37,24 +38,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger('task_executor')
 
+# 默认可重试的瞬时异常类型（永久性错误应立即失败，不浪费重试）
+RETRYABLE_EXCEPTIONS = (TimeoutError, ConnectionError)
+
 class TaskExecutor:
     """任务执行者类，负责执行规划者分配的具体小任务"""
-    
-    def __init__(self, context_manager=None, timeout=500, verbose=False, use_gemini=True):
+
+    def __init__(self, context_manager=None, timeout=500, verbose=False, use_gemini=True,
+                 max_retries=3, base_delay=0.5, max_delay=30, retryable_exceptions=None):
         """
         初始化任务执行者
-        
+
         参数:
             context_manager (ContextManager, optional): 上下文管理器实例
             timeout (int): Claude命令执行超时时间(秒)
             verbose (bool): 是否打印详细日志
             use_gemini (bool): 是否使用Gemini来判断任务完成状态，默认为True
+            max_retries (int): 瞬时错误的最大重试次数
+            base_delay (float): 指数退避的基础延迟(秒)
+            max_delay (float): 单次退避延迟的上限(秒)
+            retryable_exceptions (tuple, optional): 可重试的异常类型，默认为RETRYABLE_EXCEPTIONS
         """
         self.context_manager = context_manager
         self.timeout = timeout
         self.verbose = verbose
         self.use_gemini = use_gemini
-        
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable_exceptions = retryable_exceptions or RETRYABLE_EXCEPTIONS
+
+        # 缓存当前工作目录和相对路径->绝对路径的映射，
+        # 避免每次构建提示时重复调用getcwd和os.path.join
+        self._cwd = os.getcwd()
+        self._abspath_cache = {}
+
+        # 输出文件存在性检查的TTL缓存: path -> (exists, 检查时刻)
+        # TTL很短，只为合并同一验证窗口内的重复检查
+        self._exists_cache = {}
+        self._exists_ttl = 0.5
+
         # 检查是否可以使用Gemini
         if self.use_gemini and not GEMINI_AVAILABLE:
             logger.warning("请求使用Gemini进行任务分析，但未能导入相关模块，将使用默认分析方法")
@@ -64,6 +87,105 @@ class TaskExecutor:
             
         logger.info("任务执行者已初始化")
         
+    def refresh_cwd(self):
+        """刷新缓存的工作目录（测试中调用chdir后使用）"""
+        self._cwd = os.getcwd()
+        self._abspath_cache.clear()
+
+    def _to_abs_path(self, path):
+        """
+        将相对路径解析为绝对路径，结果按相对路径缓存
+
+        参数:
+            path (str): 输入路径（绝对路径原样返回）
+
+        返回:
+            str: 绝对路径
+        """
+        if os.path.isabs(path):
+            return path
+
+        cached = self._abspath_cache.get(path)
+        if cached is None:
+            if self.context_manager and self.context_manager.context_dir:
+                context_dir = self.context_manager.context_dir
+                if os.path.isabs(context_dir):
+                    cached = os.path.join(context_dir, path)
+                else:
+                    cached = os.path.join(self._cwd, context_dir, path)
+            else:
+                cached = os.path.join(self._cwd, path)
+            self._abspath_cache[path] = cached
+        return cached
+
+    def _call_claude_api(self, prompt, **kwargs):
+        """
+        调用claude_api，对瞬时错误使用指数退避加随机抖动重试
+
+        只重试retryable_exceptions中列出的异常类型，其余异常立即抛出；
+        重试次数用尽后抛出最后一次的异常。
+
+        参数:
+            prompt (str): 发送给Claude的提示
+            **kwargs: 透传给claude_api的其他参数
+
+        返回:
+            dict: claude_api的响应
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return claude_api(prompt, **kwargs)
+            except self.retryable_exceptions as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                wait = random.uniform(0, delay)
+                logger.warning(
+                    f"调用Claude时发生瞬时错误: {str(e)}，"
+                    f"{wait:.2f}秒后重试 ({attempt + 1}/{self.max_retries})"
+                )
+                time.sleep(wait)
+
+    def _exists_cached(self, path, force_fresh=False):
+        """
+        带TTL缓存的文件存在性检查
+
+        参数:
+            path (str): 要检查的路径
+            force_fresh (bool): 为True时绕过缓存，并用open探测
+                以刷新NFS等网络文件系统的属性缓存
+
+        返回:
+            bool: 文件是否存在
+        """
+        now = time.monotonic()
+        if not force_fresh:
+            hit = self._exists_cache.get(path)
+            if hit is not None and now - hit[1] < self._exists_ttl:
+                return hit[0]
+            exists = os.path.exists(path)
+        else:
+            # open探测能绕过NFS的属性缓存，拿到最新状态
+            try:
+                fd = os.open(path, os.O_RDONLY)
+                os.close(fd)
+                exists = True
+            except OSError:
+                exists = os.path.exists(path)
+
+        self._exists_cache[path] = (exists, now)
+        return exists
+
+    def _invalidate_exists(self, paths):
+        """
+        使指定路径的存在性缓存失效（在预期写入发生后调用）
+
+        参数:
+            paths (iterable): 需要重新检查的路径集合
+        """
+        for path in paths:
+            self._exists_cache.pop(path, None)
+
     def _run_async_tool(self, coro):
         """
         运行异步工具（可用于测试替换）
@@ -158,7 +280,7 @@ class TaskExecutor:
             conversation_history = task_context.local_context.get('conversation_history', None)
             
             # 使用claude_cli直接执行，根据设置决定是否使用Gemini
-            response = claude_api(
+            response = self._call_claude_api(
                 prompt,
                 task_definition=subtask,  # 传入完整任务定义
                 verbose=self.verbose,
@@ -239,7 +361,7 @@ class TaskExecutor:
                                 
                                 # 如果直接输入失败，可以尝试重新调用claude_api
                                 logger.info("尝试通过API重新发送请求...")
-                                continue_response = claude_api(
+                                continue_response = self._call_claude_api(
                                     continue_message,
                                     task_definition=subtask,
                                     verbose=self.verbose,
@@ -274,8 +396,10 @@ class TaskExecutor:
                     )
                 
                 elif task_status == "NEEDS_VERIFICATION":
-                    # 验证所有预期的输出文件是否已经被创建
-                    missing_files = self._verify_output_files(subtask)
+                    # 验证所有预期的输出文件是否已经被创建；
+                    # 执行步骤刚刚发生过预期写入，fresh=True先使
+                    # 这批路径的缓存失效再重查，避免TTL内的旧结果
+                    missing_files = self._verify_output_files(subtask, fresh=True)
                     
                     if missing_files:
                         # 文件缺失，修改状态为错误
@@ -410,6 +534,25 @@ class TaskExecutor:
                 }
             }
     
+    async def execute_subtask_async(self, subtask, task_context=None):
+        """
+        在工作线程中执行子任务，不阻塞事件循环
+
+        execute_subtask是同步的，内部的claude_api调用会阻塞；
+        在异步上下文中通过asyncio.to_thread把整个执行推到线程池，
+        事件循环得以继续处理回调和IO。多个子任务可用
+        asyncio.gather(*map(executor.execute_subtask_async, subtasks))并发执行。
+
+        参数:
+            subtask (dict): 子任务定义
+            task_context (TaskContext, optional): 任务上下文
+
+        返回:
+            dict: 执行结果
+        """
+        import asyncio
+        return await asyncio.to_thread(self.execute_subtask, subtask, task_context)
+
     def _prepare_context_aware_prompt(self, subtask, task_context):
         """
         构建包含上下文信息的提示
@@ -426,8 +569,8 @@ class TaskExecutor:
         task_name = subtask.get('name', task_id)
         instruction = subtask.get('instruction', '')
         
-        # 添加当前工作目录信息
-        current_working_dir = os.getcwd()
+        # 添加当前工作目录信息（使用缓存值避免每次构建提示都发起系统调用）
+        current_working_dir = self._cwd
         context_dir = self.context_manager.context_dir if self.context_manager else "output/logs/subtasks_execution"
         
         # 添加任务目标和背景
@@ -448,16 +591,9 @@ class TaskExecutor:
             prompt_parts.append("你必须创建以下具体文件（使用完整的绝对路径）：")
             
             for output_type, output_path in subtask['output_files'].items():
-                # 确保路径是绝对路径
-                if not os.path.isabs(output_path):
-                    if self.context_manager and self.context_manager.context_dir:
-                        if os.path.isabs(self.context_manager.context_dir):
-                            output_path = os.path.join(self.context_manager.context_dir, output_path)
-                        else:
-                            output_path = os.path.join(current_working_dir, self.context_manager.context_dir, output_path)
-                    else:
-                        output_path = os.path.join(current_working_dir, output_path)
-                
+                # 确保路径是绝对路径（带缓存）
+                output_path = self._to_abs_path(output_path)
+
                 if output_type == 'main_result':
                     prompt_parts.append(f"- 主要结果: {output_path}")
                 else:
@@ -870,29 +1006,72 @@ class TaskExecutor:
         
         return extension_map.get(lang.lower(), '.txt')
     
-    def _verify_output_files(self, subtask):
+    def _verify_output_files(self, subtask, fresh=False):
         """
         验证所有预期的输出文件是否已经被创建
-        
+
         参数:
             subtask (dict): 子任务定义
-            
+            fresh (bool): 为True时先调用_invalidate_exists使这批路径的
+                存在性缓存失效，再用open探测逐个重查。用于预期写入
+                （如子任务执行）之后的复核，避免TTL内的旧结果把
+                刚写出的文件报告为缺失
+
         返回:
             list: 缺失的文件路径列表
         """
         missing_files = []
         if 'output_files' in subtask and isinstance(subtask['output_files'], dict):
+            resolved = []
             for output_type, output_path in subtask['output_files'].items():
-                # 如果是相对路径，转换为绝对路径
+                # 如果是相对路径，转换为绝对路径（带缓存，每个路径只做一次join）
                 if not os.path.isabs(output_path) and self.context_manager and self.context_manager.context_dir:
-                    output_path = os.path.join(self.context_manager.context_dir, output_path)
-                
+                    output_path = self._to_abs_path(output_path)
+
                 # 记录文件验证
                 logger.info(f"验证输出文件是否存在: {output_path}")
-                    
-                if not os.path.exists(output_path):
-                    missing_files.append(f"{output_type}: {output_path}")
-        
+                resolved.append((output_type, output_path))
+
+            if fresh:
+                # 预期写入刚刚发生：先失效缓存再逐个探测；
+                # open探测同时能刷新NFS等网络文件系统的属性缓存
+                self._invalidate_exists(path for _, path in resolved)
+                for output_type, output_path in resolved:
+                    if not self._exists_cached(output_path, force_fresh=True):
+                        missing_files.append(f"{output_type}: {output_path}")
+                return missing_files
+
+            # 冷查询路径：按父目录分组，每个目录只做一次scandir，
+            # 把O(N)次stat降为O(不同目录数)次目录扫描
+            groups = {}
+            now = time.monotonic()
+            for output_type, output_path in resolved:
+                # TTL内的重复验证直接使用缓存的结果
+                hit = self._exists_cache.get(output_path)
+                if hit is not None and now - hit[1] < self._exists_ttl:
+                    if not hit[0]:
+                        missing_files.append(f"{output_type}: {output_path}")
+                    continue
+
+                directory = os.path.dirname(output_path) or "."
+                groups.setdefault(directory, []).append((output_type, output_path))
+
+            for directory, items in groups.items():
+                try:
+                    existing_names = {entry.name for entry in os.scandir(directory)}
+                except (FileNotFoundError, NotADirectoryError):
+                    # 目录本身不存在，其中的所有文件都视为缺失
+                    for output_type, output_path in items:
+                        self._exists_cache[output_path] = (False, now)
+                        missing_files.append(f"{output_type}: {output_path}")
+                    continue
+
+                for output_type, output_path in items:
+                    exists = os.path.basename(output_path) in existing_names
+                    self._exists_cache[output_path] = (exists, now)
+                    if not exists:
+                        missing_files.append(f"{output_type}: {output_path}")
+
         return missing_files
         
     def _determine_file_type(self, file_path):
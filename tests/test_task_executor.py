@@ -65,12 +65,12 @@ report.md：
     }
 
 class TestTaskExecutor:
-    
-    @pytest.fixture
-    def setup_executor(self, temp_dir):
-        """设置TaskExecutor测试环境"""
-        # 创建上下文目录
-        context_dir = os.path.join(temp_dir, "context")
+
+    @pytest.fixture(scope="module")
+    def setup_executor(self, tmp_path_factory):
+        """设置TaskExecutor测试环境（模块级共享，各测试使用不同的任务ID）"""
+        # 创建上下文目录（整个模块共用一个临时目录，减少每个测试的文件系统开销）
+        context_dir = os.path.join(str(tmp_path_factory.mktemp("executor")), "context")
         os.makedirs(context_dir, exist_ok=True)
         os.makedirs(os.path.join(context_dir, "results"), exist_ok=True)
         
@@ -268,7 +268,7 @@ class TestTaskExecutor:
         assert "请处理上下文中的信息" in prompt
         assert "input_data: /path/to/input.json" in prompt
 
-    def test_report_file_creation(self, setup_executor, temp_dir):
+    def test_report_file_creation(self, setup_executor):
         """测试文件生成功能 - 专注于report.md"""
         executor = setup_executor["executor"]
         context_dir = setup_executor["context_dir"]
@@ -8,6 +8,17 @@ import json
 import tempfile
 from unittest.mock import patch, MagicMock
 
+# 错误信息断言用的标记集合，统一lower()一次后做成员检查
+_TIMEOUT_TOKENS = ("超时", "timeout")
+_MISSING_FILE_TOKENS = ("未能创建预期的输出文件",)
+
+
+def _has_token(text, tokens):
+    """检查文本（小写化后）是否包含任一标记"""
+    text = text.lower()
+    return any(token in text for token in tokens)
+
+
 def test_task_execution_with_gemini_status(mock_claude_api, mock_gemini, test_task_definition):
     """测试使用Gemini进行任务状态判断的执行流程"""
     try:
@@ -70,7 +81,7 @@ def test_needs_verification_status(mock_claude_api, mock_gemini, temp_dir):
     
     # 验证结果应该失败，因为文件不存在
     assert result["success"] is False
-    assert "未能创建预期的输出文件" in result.get("error", "")
+    assert _has_token(result.get("error", ""), _MISSING_FILE_TOKENS)
     
     # 创建输出文件
     with open(test_output_file, 'w') as f:
@@ -197,10 +208,16 @@ async def test_continue_on_incomplete_task(mock_tool_execution):
         }
     ]
     
-    mock_claude_api = MagicMock(side_effect=mock_responses)
-    
+    # 用普通闭包代替MagicMock，避免每次调用的mock分发开销
+    _responses = iter(mock_responses)
+    calls = []
+
+    def fake_claude_api(*args, **kwargs):
+        calls.append((args, kwargs))
+        return next(_responses)
+
     # 使用patch替换真实的claude_api
-    with patch('task_planner.core.task_executor.claude_api', mock_claude_api):
+    with patch('task_planner.core.task_executor.claude_api', fake_claude_api):
         # 创建执行器实例
         executor = TaskExecutor(verbose=True)
         
@@ -211,14 +228,14 @@ async def test_continue_on_incomplete_task(mock_tool_execution):
             "instruction": "创建一个需要多次交互的任务"
         }
         
-        # 执行任务
-        result = executor.execute_subtask(task)
-        
+        # 执行任务（异步版本在线程中运行，不阻塞事件循环）
+        result = await executor.execute_subtask_async(task)
+
         # 验证claude_api被调用了两次
-        assert mock_claude_api.call_count == 2
+        assert len(calls) == 2
         
         # 第二次调用应该包含"继续"的消息
-        second_call_args = mock_claude_api.call_args_list[1][0]
+        second_call_args = calls[1][0]
         assert "继续" in second_call_args[0].lower()
         
         # 验证最终结果是成功的
@@ -251,7 +268,7 @@ def test_timeout_handling():
         
         # 验证结果包含超时信息
         assert result["success"] is False
-        assert "超时" in result.get("error", "").lower() or "timeout" in result.get("error", "").lower()
+        assert _has_token(result.get("error", ""), _TIMEOUT_TOKENS)
 
 def test_error_recovery():
     """测试在发生错误时的恢复机制"""
@@ -261,9 +278,10 @@ def test_error_recovery():
     except ImportError:
         pytest.skip("TaskExecutor不可用")
     
-    # 设置mock以模拟错误和恢复
+    # 设置mock以模拟错误和恢复；使用可重试的瞬时错误类型，
+    # 非白名单内的异常会立即抛出而不重试
     side_effects = [
-        Exception("模拟错误"),  # 第一次调用抛出异常
+        ConnectionError("模拟错误"),  # 第一次调用抛出瞬时异常
         {  # 第二次调用正常返回
             "status": "success",
             "output": "恢复后的执行",
@@ -272,11 +290,20 @@ def test_error_recovery():
         }
     ]
     
-    mock_claude_api = MagicMock(side_effect=side_effects)
-    
-    with patch('task_planner.core.task_executor.claude_api', mock_claude_api):
-        # 创建执行器实例，启用重试
-        executor = TaskExecutor(verbose=True, max_retries=1)
+    # 同样使用闭包代替MagicMock（异常实例直接raise）
+    _effects = iter(side_effects)
+    calls = []
+
+    def fake_claude_api(*args, **kwargs):
+        calls.append((args, kwargs))
+        effect = next(_effects)
+        if isinstance(effect, Exception):
+            raise effect
+        return effect
+
+    with patch('task_planner.core.task_executor.claude_api', fake_claude_api):
+        # 创建执行器实例，启用重试（小退避基数避免测试变慢）
+        executor = TaskExecutor(verbose=True, max_retries=1, base_delay=0.01)
         
         # 创建测试任务
         task = {
@@ -292,4 +319,4 @@ def test_error_recovery():
         assert result["success"] is True
         
         # 验证重试机制被触发
-        assert mock_claude_api.call_count == 2
\ No newline at end of file
+        assert len(calls) == 2
\ No newline at end of file